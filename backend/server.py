@@ -1,18 +1,30 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, UploadFile, File
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, UploadFile, File, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.responses import ORJSONResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
+from starlette.middleware.gzip import GZipMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
 import os
+import asyncio
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field, EmailStr
 from typing import List, Optional
 import uuid
+import time
 from datetime import datetime, timezone, timedelta
+from calendar import timegm
 import jwt
-from passlib.context import CryptContext
+from jwt.algorithms import get_default_algorithms
+from jwt.utils import base64url_encode
+import bcrypt
 import shutil
+import anyio
+import orjson
+from cachetools import TTLCache
 
 
 ROOT_DIR = Path(__file__).parent
@@ -20,21 +32,55 @@ load_dotenv(ROOT_DIR / '.env')
 
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+# Pool sizes apply per worker process: total connections = workers x pool size
+client = AsyncIOMotorClient(
+    mongo_url,
+    minPoolSize=int(os.getenv("MONGO_MIN_POOL_SIZE", "1")),
+    maxPoolSize=int(os.getenv("MONGO_MAX_POOL_SIZE", "20")),
+    serverSelectionTimeoutMS=3000,
+    # Return stored BSON dates as UTC-aware datetimes
+    tz_aware=True,
+)
 db = client[os.environ['DB_NAME']]
 
 # Create the main app without a prefix
-app = FastAPI(title="GenMoney API", description="Financial Education Platform for Gen Z")
+app = FastAPI(
+    title="GenMoney API",
+    description="Financial Education Platform for Gen Z",
+    default_response_class=ORJSONResponse,
+)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
 # Security
 security = HTTPBearer()
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "10"))
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "genmoney-secret-key-2024")
 ALGORITHM = "HS256"
+# Signing key bytes and accepted algorithms, built once rather than per token
+JWT_KEY = SECRET_KEY.encode("utf-8")
+JWT_ALGORITHMS = [ALGORITHM]
+# HS256 signer, prepared key and encoded header reused by create_access_token
+_JWT_SIGNER = get_default_algorithms()[ALGORITHM]
+_JWT_SIGNING_KEY = _JWT_SIGNER.prepare_key(JWT_KEY)
+_JWT_HEADER_B64 = base64url_encode(orjson.dumps({"alg": ALGORITHM, "typ": "JWT"}))
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+# Worker threads available for bcrypt, which would otherwise block the event loop
+BCRYPT_THREAD_LIMIT = 64
+
+# Decoded JWT payloads keyed by raw token; only successfully validated tokens are stored
+_jwt_cache = TTLCache(maxsize=10_000, ttl=ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+# User models keyed by user id; drop the entry whenever the user document is updated
+_user_cache = TTLCache(maxsize=10_000, ttl=60)
+
+def generate_id() -> str:
+    # 32-char hex form: shorter documents and index keys than the hyphenated UUID
+    return uuid.uuid4().hex
+
+def seed_id(name: str) -> str:
+    # Deterministic id so every worker seeding at startup targets the same document
+    return uuid.uuid5(uuid.NAMESPACE_URL, f"genmoney:{name}").hex
 
 # User Models
 class UserCreate(BaseModel):
@@ -47,8 +93,8 @@ class UserLogin(BaseModel):
     password: str
 
 class User(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    email: EmailStr
+    id: str = Field(default_factory=generate_id)
+    email: str  # validated once by UserCreate at registration
     full_name: str
     is_admin: bool = False
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
@@ -75,7 +121,7 @@ class CourseCreate(BaseModel):
     topics: List[str] = Field(default_factory=list)
 
 class Course(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=generate_id)
     title: str
     description: str
     price: float
@@ -95,7 +141,7 @@ class PaymentCreate(BaseModel):
     payment_method: str  # mock_payment, gopay, ovo, bank_transfer
 
 class Payment(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=generate_id)
     user_id: str
     course_id: str
     amount: float
@@ -103,12 +149,25 @@ class Payment(BaseModel):
     status: str = "completed"  # For MVP, all payments are successful
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
+# Dashboard Models
+class UserDashboard(BaseModel):
+    user: User
+    enrolled_courses: List[Course]
+    payment_history: Optional[List[Payment]] = None  # null when include_history=false
+    badges: List[str]
+    total_spent: float
+
+# Mongo projections for endpoints that return raw documents through a response_model
+COURSE_PROJECTION = {"_id": 0, **{field: 1 for field in Course.model_fields}}
+PAYMENT_PROJECTION = {"_id": 0, **{field: 1 for field in Payment.model_fields}}
+USER_PROJECTION = {"_id": 0, "password_hash": 0}
+
 # Helper Functions
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(BCRYPT_ROUNDS)).decode("utf-8")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -117,12 +176,30 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     else:
         expire = datetime.now(timezone.utc) + timedelta(minutes=15)
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
+    # Datetime claims become NumericDate values, as jwt.encode does
+    for claim, value in to_encode.items():
+        if isinstance(value, datetime):
+            to_encode[claim] = timegm(value.utctimetuple())
+    signing_input = _JWT_HEADER_B64 + b"." + base64url_encode(orjson.dumps(to_encode))
+    signature = _JWT_SIGNER.sign(signing_input, _JWT_SIGNING_KEY)
+    return (signing_input + b"." + base64url_encode(signature)).decode("ascii")
+
+async def _get_enrolled_courses(user_id: str):
+    # Read enrolled_courses from Mongo: a cached User can be stale in other workers
+    user = await db.users.find_one({"id": user_id}, {"_id": 0, "enrolled_courses": 1})
+    course_ids = user.get("enrolled_courses", []) if user else []
+    if not course_ids:
+        return course_ids, []
+    courses_cursor = db.courses.find({"id": {"$in": course_ids}}, COURSE_PROJECTION)
+    return course_ids, await courses_cursor.to_list(1000)
 
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    token = credentials.credentials
+    payload = _jwt_cache.get(token)
     try:
-        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
+        if payload is None or payload.get("exp", 0) <= time.time():
+            payload = jwt.decode(token, JWT_KEY, algorithms=JWT_ALGORITHMS)
+            _jwt_cache[token] = payload
         user_id: str = payload.get("sub")
         if user_id is None:
             raise HTTPException(status_code=401, detail="Invalid token")
@@ -131,10 +208,16 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
     
-    user = await db.users.find_one({"id": user_id})
+    cached_user = _user_cache.get(user_id)
+    if cached_user is not None:
+        return cached_user
+    
+    user = await db.users.find_one({"id": user_id}, USER_PROJECTION)
     if user is None:
         raise HTTPException(status_code=401, detail="User not found")
-    return User(**user)
+    user_obj = User(**user)
+    _user_cache[user_id] = user_obj
+    return user_obj
 
 async def get_admin_user(current_user: User = Depends(get_current_user)):
     if not current_user.is_admin:
@@ -144,25 +227,24 @@ async def get_admin_user(current_user: User = Depends(get_current_user)):
 # Authentication Routes
 @api_router.post("/auth/register", response_model=Token)
 async def register(user_data: UserCreate):
-    # Check if user exists
-    existing_user = await db.users.find_one({"email": user_data.email})
-    if existing_user:
-        raise HTTPException(status_code=400, detail="Email already registered")
-    
     # Create new user
-    hashed_password = hash_password(user_data.password)
+    hashed_password = await anyio.to_thread.run_sync(hash_password, user_data.password)
     user_dict = {
-        **user_data.dict(exclude={"password"}),
+        **user_data.model_dump(exclude={"password"}),
         "password_hash": hashed_password,
-        "id": str(uuid.uuid4()),
+        "id": generate_id(),
         "is_admin": False,
-        "created_at": datetime.now(timezone.utc).isoformat(),
+        "created_at": datetime.now(timezone.utc),
         "enrolled_courses": [],
         "badges": [],
         "progress": {}
     }
     
-    await db.users.insert_one(user_dict)
+    # The unique index on users.email rejects duplicate registrations
+    try:
+        await db.users.insert_one(user_dict)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Email already registered")
     
     # Create access token
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -175,8 +257,10 @@ async def register(user_data: UserCreate):
 
 @api_router.post("/auth/login", response_model=Token)
 async def login(user_data: UserLogin):
-    user = await db.users.find_one({"email": user_data.email})
-    if not user or not verify_password(user_data.password, user["password_hash"]):
+    user = await db.users.find_one({"email": user_data.email}, {"_id": 0})
+    if not user or not await anyio.to_thread.run_sync(
+        verify_password, user_data.password, user["password_hash"]
+    ):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -184,7 +268,8 @@ async def login(user_data: UserLogin):
         data={"sub": user["id"]}, expires_delta=access_token_expires
     )
     
-    user_obj = User(**{k: v for k, v in user.items() if k != "password_hash"})
+    # User ignores extra fields, so password_hash never reaches the response
+    user_obj = User(**user)
     return Token(access_token=access_token, token_type="bearer", user=user_obj)
 
 # Course Routes
@@ -196,33 +281,35 @@ async def get_courses(category: Optional[str] = None, level: Optional[str] = Non
     if level:
         query["level"] = level
     
-    courses = await db.courses.find(query).to_list(1000)
-    return [Course(**course) for course in courses]
+    return await db.courses.find(query, COURSE_PROJECTION).to_list(1000)
 
 @api_router.get("/courses/{course_id}", response_model=Course)
 async def get_course(course_id: str):
-    course = await db.courses.find_one({"id": course_id})
+    course = await db.courses.find_one({"id": course_id}, COURSE_PROJECTION)
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
     return Course(**course)
 
 @api_router.post("/courses", response_model=Course)
 async def create_course(course_data: CourseCreate, admin_user: User = Depends(get_admin_user)):
-    course_dict = course_data.dict()
+    course_dict = course_data.model_dump()
     course_dict.update({
-        "id": str(uuid.uuid4()),
-        "created_at": datetime.now(timezone.utc).isoformat(),
+        "id": generate_id(),
+        "created_at": datetime.now(timezone.utc),
         "enrolled_count": 0
     })
     
     await db.courses.insert_one(course_dict)
-    return Course(**course_dict)
+    # course_dict is built from validated input, so skip re-validation
+    return Course.model_construct(**course_dict)
 
 # Payment Routes
 @api_router.post("/payments/purchase", response_model=dict)
 async def purchase_course(payment_data: PaymentCreate, current_user: User = Depends(get_current_user)):
     # Get course details
-    course = await db.courses.find_one({"id": payment_data.course_id})
+    course = await db.courses.find_one(
+        {"id": payment_data.course_id}, {"_id": 0, "price": 1, "title": 1}
+    )
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
     
@@ -232,28 +319,54 @@ async def purchase_course(payment_data: PaymentCreate, current_user: User = Depe
     
     # Create payment record (mock success for MVP)
     payment_dict = {
-        "id": str(uuid.uuid4()),
+        "id": generate_id(),
         "user_id": current_user.id,
         "course_id": payment_data.course_id,
         "amount": course["price"],
         "payment_method": payment_data.payment_method,
         "status": "completed",
-        "created_at": datetime.now(timezone.utc).isoformat()
+        "created_at": datetime.now(timezone.utc)
     }
     
     await db.payments.insert_one(payment_dict)
     
-    # Update user's enrolled courses
-    await db.users.update_one(
-        {"id": current_user.id},
-        {"$push": {"enrolled_courses": payment_data.course_id}}
+    # Enroll the user and bump the course enrollment count in one round;
+    # the $ne guard makes the enrollment atomic against concurrent purchases
+    enrollment, count_update = await asyncio.gather(
+        db.users.update_one(
+            {"id": current_user.id, "enrolled_courses": {"$ne": payment_data.course_id}},
+            {"$addToSet": {"enrolled_courses": payment_data.course_id}}
+        ),
+        db.courses.update_one(
+            {"id": payment_data.course_id},
+            {"$inc": {"enrolled_count": 1}}
+        ),
+        return_exceptions=True
     )
+    _user_cache.pop(current_user.id, None)
     
-    # Update course enrollment count
-    await db.courses.update_one(
-        {"id": payment_data.course_id},
-        {"$inc": {"enrolled_count": 1}}
-    )
+    # Undo the payment and count only when the enrollment definitely did not happen.
+    # Ambiguous errors (e.g. network timeouts) propagate and leave the payment in place.
+    enrollment_failed = isinstance(enrollment, OperationFailure)
+    if enrollment_failed or (
+        not isinstance(enrollment, BaseException) and enrollment.modified_count == 0
+    ):
+        compensations = [db.payments.delete_one({"id": payment_dict["id"]})]
+        if not isinstance(count_update, BaseException):
+            compensations.append(db.courses.update_one(
+                {"id": payment_data.course_id},
+                {"$inc": {"enrolled_count": -1}}
+            ))
+        await asyncio.gather(*compensations)
+        if enrollment_failed:
+            raise enrollment
+        raise HTTPException(status_code=400, detail="Already enrolled in this course")
+    if isinstance(enrollment, BaseException):
+        raise enrollment
+    
+    # The user is enrolled and has paid; a missed counter update shouldn't fail the purchase
+    if isinstance(count_update, BaseException):
+        logger.warning(f"Failed to update enrolled_count for course {payment_data.course_id}: {count_update}")
     
     return {
         "message": "Course purchased successfully!",
@@ -262,61 +375,83 @@ async def purchase_course(payment_data: PaymentCreate, current_user: User = Depe
     }
 
 # User Dashboard Routes
-@api_router.get("/user/dashboard", response_model=dict)
-async def get_user_dashboard(current_user: User = Depends(get_current_user)):
+@api_router.get("/user/dashboard", response_model=UserDashboard)
+async def get_user_dashboard(
+    include_history: bool = True, current_user: User = Depends(get_current_user)
+):
     # Get enrolled courses
-    enrolled_courses = []
-    if current_user.enrolled_courses:
-        courses_cursor = db.courses.find({"id": {"$in": current_user.enrolled_courses}})
-        enrolled_courses = await courses_cursor.to_list(1000)
+    enrolled_courses_task = _get_enrolled_courses(current_user.id)
     
-    # Get payment history
-    payments_cursor = db.payments.find({"user_id": current_user.id})
-    payments = await payments_cursor.to_list(1000)
+    # Get payment history, or only the total when the history isn't requested
+    if include_history:
+        payments_cursor = db.payments.find({"user_id": current_user.id}, PAYMENT_PROJECTION)
+    else:
+        payments_cursor = db.payments.aggregate([
+            {"$match": {"user_id": current_user.id}},
+            {"$group": {"_id": None, "total": {"$sum": "$amount"}, "count": {"$sum": 1}}}
+        ])
+    payments_task = payments_cursor.to_list(1000)
     
-    return {
-        "user": current_user,
-        "enrolled_courses": [Course(**course) for course in enrolled_courses],
-        "payment_history": [Payment(**payment) for payment in payments],
+    # Both queries are independent, so run them concurrently
+    (course_ids, enrolled_courses), payments = await asyncio.gather(
+        enrolled_courses_task, payments_task
+    )
+    
+    dashboard = {
+        "user": current_user.model_copy(update={"enrolled_courses": course_ids}),
+        "enrolled_courses": enrolled_courses,
         "badges": current_user.badges,
-        "total_spent": sum(payment["amount"] for payment in payments)
     }
+    if include_history:
+        dashboard["payment_history"] = payments
+        dashboard["total_spent"] = sum(payment["amount"] for payment in payments)
+    else:
+        dashboard["total_spent"] = payments[0]["total"] if payments else 0
+    return dashboard
 
 # Categories endpoint
+# The category list is static, so serialize it once at import time
+CATEGORIES = {
+    "categories": [
+        {
+            "id": "personal_finance",
+            "name": "Personal Finance",
+            "description": "Atur keuangan pribadi dengan smart",
+            "icon": "💰",
+            "color": "bg-emerald-500"
+        },
+        {
+            "id": "stocks",
+            "name": "Saham & Investasi",
+            "description": "Mulai investasi saham dari nol",
+            "icon": "📈",
+            "color": "bg-blue-500"
+        },
+        {
+            "id": "crypto",
+            "name": "Crypto & Blockchain",
+            "description": "Pahami dunia crypto dengan aman",
+            "icon": "₿",
+            "color": "bg-orange-500"
+        },
+        {
+            "id": "mutual_funds",
+            "name": "Reksa Dana",
+            "description": "Investasi mudah untuk pemula",
+            "icon": "🏦",
+            "color": "bg-purple-500"
+        }
+    ]
+}
+_CATEGORIES_BYTES = orjson.dumps(CATEGORIES)
+
 @api_router.get("/categories")
 async def get_categories():
-    return {
-        "categories": [
-            {
-                "id": "personal_finance",
-                "name": "Personal Finance",
-                "description": "Atur keuangan pribadi dengan smart",
-                "icon": "💰",
-                "color": "bg-emerald-500"
-            },
-            {
-                "id": "stocks",
-                "name": "Saham & Investasi",
-                "description": "Mulai investasi saham dari nol",
-                "icon": "📈",
-                "color": "bg-blue-500"
-            },
-            {
-                "id": "crypto",
-                "name": "Crypto & Blockchain",
-                "description": "Pahami dunia crypto dengan aman",
-                "icon": "₿",
-                "color": "bg-orange-500"
-            },
-            {
-                "id": "mutual_funds",
-                "name": "Reksa Dana",
-                "description": "Investasi mudah untuk pemula",
-                "icon": "🏦",
-                "color": "bg-purple-500"
-            }
-        ]
-    }
+    return Response(
+        content=_CATEGORIES_BYTES,
+        media_type="application/json",
+        headers={"Cache-Control": "public, max-age=3600"},
+    )
 
 # Include the router in the main app
 app.include_router(api_router)
@@ -336,6 +471,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress larger JSON responses such as the course list and dashboard
+app.add_middleware(GZipMiddleware, minimum_size=500)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -345,30 +483,50 @@ logger = logging.getLogger(__name__)
 
 @app.on_event("startup")
 async def startup_event():
+    anyio.to_thread.current_default_thread_limiter().total_tokens = BCRYPT_THREAD_LIMIT
+
+    # Establish the connection pool before the first request arrives
+    await client.admin.command("ping")
+
+    # Ensure indexes for the lookups done on every request
+    await db.users.create_index("email", unique=True)
+    await db.users.create_index("id", unique=True)
+    await db.courses.create_index("id", unique=True)
+    await db.courses.create_index([("category", 1), ("level", 1)])
+    await db.payments.create_index("user_id")
+
     # Create sample admin user if not exists
     admin_email = "admin@genmoney.com"
-    existing_admin = await db.users.find_one({"email": admin_email})
+    existing_admin = await db.users.find_one({"email": admin_email}, {"_id": 1})
     if not existing_admin:
+        admin_password_hash = await anyio.to_thread.run_sync(hash_password, "admin123")
         admin_dict = {
-            "id": str(uuid.uuid4()),
+            "id": generate_id(),
             "email": admin_email,
             "full_name": "Admin GenMoney",
-            "password_hash": hash_password("admin123"),
+            "password_hash": admin_password_hash,
             "is_admin": True,
-            "created_at": datetime.now(timezone.utc).isoformat(),
+            "created_at": datetime.now(timezone.utc),
             "enrolled_courses": [],
             "badges": [],
             "progress": {}
         }
-        await db.users.insert_one(admin_dict)
-        logger.info("Admin user created: admin@genmoney.com / admin123")
+        # Every worker runs this hook, so insert only if no other worker got there first
+        try:
+            result = await db.users.update_one(
+                {"email": admin_email}, {"$setOnInsert": admin_dict}, upsert=True
+            )
+        except DuplicateKeyError:
+            result = None
+        if result is not None and result.upserted_id is not None:
+            logger.info("Admin user created: admin@genmoney.com / admin123")
     
     # Create sample courses if not exist
     courses_count = await db.courses.count_documents({})
     if courses_count == 0:
         sample_courses = [
             {
-                "id": str(uuid.uuid4()),
+                "id": seed_id("course:financial-planning-101"),
                 "title": "Financial Planning 101: Gaji Gak Numpang Lewat",
                 "description": "Belajar ngatur duit biar gak habis di awal bulan. Cocok banget buat yang baru kerja!",
                 "price": 199000,
@@ -377,11 +535,11 @@ async def startup_event():
                 "mentor_name": "Sarah Wijaya",
                 "duration": "2.5 jam",
                 "topics": ["Budgeting", "Emergency Fund", "Debt Management", "Savings Goals"],
-                "created_at": datetime.now(timezone.utc).isoformat(),
+                "created_at": datetime.now(timezone.utc),
                 "enrolled_count": 0
             },
             {
-                "id": str(uuid.uuid4()),
+                "id": seed_id("course:saham-untuk-pemula"),
                 "title": "Saham untuk Pemula: Investasi Tanpa Drama",
                 "description": "Mulai investasi saham dengan strategi yang proven. No FOMO, no stress!",
                 "price": 299000,
@@ -390,11 +548,11 @@ async def startup_event():
                 "mentor_name": "Rizky Pratama",
                 "duration": "3 jam",
                 "topics": ["Stock Basics", "Company Analysis", "Risk Management", "Portfolio Building"],
-                "created_at": datetime.now(timezone.utc).isoformat(),
+                "created_at": datetime.now(timezone.utc),
                 "enrolled_count": 0
             },
             {
-                "id": str(uuid.uuid4()),
+                "id": seed_id("course:crypto-101"),
                 "title": "Crypto 101: Blockchain Buat Gen Z",
                 "description": "Pahami crypto dan blockchain technology. Investasi cerdas, bukan gambling!",
                 "price": 249000,
@@ -403,12 +561,26 @@ async def startup_event():
                 "mentor_name": "Alex Chen",
                 "duration": "2 jam",
                 "topics": ["Blockchain Basics", "DeFi", "NFTs", "Crypto Trading"],
-                "created_at": datetime.now(timezone.utc).isoformat(),
+                "created_at": datetime.now(timezone.utc),
                 "enrolled_count": 0
             }
         ]
-        await db.courses.insert_many(sample_courses)
-        logger.info(f"Created {len(sample_courses)} sample courses")
+        # Upsert on the stable seed ids so concurrent workers don't seed twice
+        try:
+            result = await db.courses.bulk_write(
+                [
+                    UpdateOne({"id": course["id"]}, {"$setOnInsert": course}, upsert=True)
+                    for course in sample_courses
+                ],
+                ordered=False,
+            )
+            created_count = result.upserted_count
+        except BulkWriteError as e:
+            if any(error["code"] != 11000 for error in e.details["writeErrors"]):
+                raise
+            created_count = e.details["nUpserted"]
+        if created_count:
+            logger.info(f"Created {created_count} sample courses")
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
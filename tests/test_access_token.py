@@ -0,0 +1,28 @@
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import jwt
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import server  # noqa: E402
+
+
+def test_create_access_token_matches_pyjwt():
+    issued_at = datetime.now(timezone.utc)
+    claims = {"sub": "user-id", "iat": issued_at, "nbf": issued_at}
+    expires_delta = timedelta(minutes=server.ACCESS_TOKEN_EXPIRE_MINUTES)
+
+    token = server.create_access_token(claims, expires_delta=expires_delta)
+    # create_access_token computes its own exp, so rebuild the reference from the decoded value
+    payload = jwt.decode(token, server.JWT_KEY, algorithms=server.JWT_ALGORITHMS)
+    expected = jwt.encode(
+        {**claims, "exp": datetime.fromtimestamp(payload["exp"], timezone.utc)},
+        server.JWT_KEY,
+        algorithm=server.ALGORITHM,
+    )
+
+    assert token == expected
+    assert payload["sub"] == "user-id"
+    assert payload["iat"] == payload["nbf"] == int(issued_at.timestamp())